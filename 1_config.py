@@ -8,10 +8,21 @@ SYMBOLS = ['SPY']
 #Portfolio capital in USD ($100k)
 INITIAL_CAPITAL = 100000.0
 
+# Execution Mode Parameters
+EXECUTION_MODE = 'SINGLE' # 'SINGLE' runs in one process, 'SHARDED' splits SYMBOLS across worker processes,
+                          # 'RESEARCH' reuses cached bars and indicators across runs
+NUM_WORKERS = 4 # Worker processes in SHARDED mode
+BAR_BUFFER_SIZE = 4096 # Shared-memory ring buffer length per symbol, in bars (SHARDED mode)
+SIGNAL_BUFFER_SIZE = 16384 # Shared-memory ring buffer length per worker, in signals (SHARDED mode)
+
 # Data & Bar Aggregation Parameters
 TICK_INTERVAL = 5  # seconds between ticks
 BAR_INTERVAL_MINUTES = 1 # Aggregate 5-sec ticks into 1-min bars
 
+# Backtest Calendar Parameters
+BACKTEST_DAYS = 15 # Calendar days covered by the backtest
+CALENDAR_FILE = 'trading_calendar.json' # Trading sessions, weekends and holidays
+
 # Mean Reversion Strategy Parameters
 LOOKBACK_PERIOD = 20 # Number of bars for moving average
 STD_DEV_MULTIPLIER = 2.0
@@ -27,3 +38,30 @@ TRANSACTION_FEES = { # Sample fee structure
 # Option Pricing Parameters
 RISK_FREE_RATE = 0.02 # Annualized ri rate
 OPTION_EXPIRY_DAYS = 2 # Time to expiry for the barrier options
+
+# Simulated Market Data Parameters
+MARKET_DATA_MODEL = 'GBM' # One of 'GBM', 'JUMP_DIFFUSION', 'STOCHASTIC_VOL', 'MEAN_REVERTING'
+MARKET_DATA_SEED = 42
+MARKET_DATA_BLOCK_SIZE = 10000 # Ticks pre-generated per block
+MARKET_DATA_START_PRICE = 100.0
+MARKET_DATA_PARAMS = { # Annualized model parameters
+    "drift": 0.0,
+    "volatility": 0.2,
+    "jump_intensity": 25.0, # Expected jumps per year (JUMP_DIFFUSION)
+    "jump_mean": 0.0, # Mean log jump size (JUMP_DIFFUSION)
+    "jump_std": 0.01, # Std dev of log jump size (JUMP_DIFFUSION)
+    "vol_of_vol": 1.5, # Volatility of log-volatility (STOCHASTIC_VOL)
+    "vol_mean_reversion": 50.0, # Speed of log-volatility reversion (STOCHASTIC_VOL)
+    "vol_price_correlation": -0.7, # Leverage effect (STOCHASTIC_VOL)
+    "mean_reversion_speed": 500.0, # Speed of log-price reversion (MEAN_REVERTING)
+}
+REFERENCE_OPTION_EXPIRY_DAYS = 2
+REFERENCE_OPTION_VOLATILITY = 0.2 # Assumed "true" volatility of the ATM reference option
+REFERENCE_OPTION_PREMIUM = 1.02 # Markup on the theoretical reference option price
+
+# Cache Parameters
+CACHE_DIR = 'cache' # Bars and indicator series reused across runs (RESEARCH mode)
+CACHE_MAX_BYTES = 1024**3 # Least recently used entries are evicted beyond 1 GB
+
+# Results Store Parameters
+RESULTS_DIR = 'results' # Every run's trades, equity points and metrics are appended here
@@ -0,0 +1,114 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+from config import CACHE_DIR, CACHE_MAX_BYTES
+
+MANIFEST_FILE = "manifest.json" # Names of the arrays an entry must contain
+
+@functools.lru_cache(maxsize=None)
+def _source_hash(code):
+    """Hash of the source of a function or class, so entries go stale when the code computing them changes."""
+    return hashlib.blake2b(inspect.getsource(code).encode(), digest_size=16).hexdigest()
+
+class SeriesCache:
+    """
+    Content-addressed on-disk cache of computed series such as bars and indicators.
+
+    An entry is keyed by a hash of its input arrays, its parameters and the
+    source of the code computing it, so a change in any of them gives a new
+    key and stale entries are never read; they simply age out. Entries are directories of .npy files, loaded memory-mapped, and
+    are shared by every run and process using the same cache directory. Once
+    the cache grows past max_bytes, the least recently used entries are evicted.
+    """
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, kind, inputs, params, code=()):
+        """
+        Returns the content hash of a kind of series computed from input arrays
+        and parameters by the given functions or classes.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(kind.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for source_hash in map(_source_hash, code):
+            digest.update(source_hash.encode())
+        for name in sorted(inputs):
+            array = np.ascontiguousarray(inputs[name])
+            digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+            digest.update(array.data)
+        return f"{kind}-{digest.hexdigest()}"
+
+    def get_or_compute(self, kind, inputs, params, compute, code=()):
+        """
+        Returns the cached arrays for these inputs and parameters, or calls
+        compute() to produce a dict of arrays, stores it and returns it.
+        code lists the functions and classes compute() relies on; their
+        source is part of the key.
+        """
+        entry = os.path.join(self.root, self.key(kind, inputs, params, code))
+        arrays = self._load(entry)
+        if arrays is not None:
+            return arrays
+
+        computed = compute()
+
+        # Write to a private directory and rename it into place, so readers in
+        # other processes never see a partial entry
+        staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            for name, array in computed.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.asarray(array))
+            with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                json.dump(sorted(computed), f)
+            try:
+                os.rename(staging, entry)
+            except OSError: # Another process stored the same entry first
+                pass
+        finally:
+            # Only still there if the entry was not renamed into place
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+        stored = self._load(entry)
+        return stored if stored is not None else computed # Larger than the whole cache
+
+    def _load(self, entry):
+        # An entry counts as cached only if its manifest and every array it lists are present
+        try:
+            with open(os.path.join(entry, MANIFEST_FILE)) as f:
+                names = json.load(f)
+            arrays = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r") for name in names}
+            os.utime(entry) # Mark as recently used
+        except (FileNotFoundError, NotADirectoryError): # Not cached, or evicted meanwhile
+            return None
+        return arrays
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name.startswith(".staging-") or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry))
+                entries.append((os.stat(entry).st_mtime, size, entry))
+            except FileNotFoundError:
+                continue
+            total += size
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # Memory maps already open on these files stay valid after removal
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
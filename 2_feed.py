@@ -1,13 +1,17 @@
 import time
 from collections import deque
+import numpy as np
 from config import SYMBOLS, BAR_INTERVAL_MINUTES
 
 class Feed:
     """
     Handles fetching market data and aggregating ticks into time bars.
     """
-    def __init__(self, api_client):
+    BAR_HISTORY = 200 # Completed bars kept per symbol
+
+    def __init__(self, api_client, bar_start=None):
         self.api = api_client
+        self.bar_start = bar_start # Optional timestamp -> bar start mapping, e.g. anchored to the session open
         self.current_bar = {} # symbol -> bar data
         self.bar_series = {} # symbol -> deque of completed bars
 
@@ -20,12 +24,15 @@ class Feed:
         price = tick["price"]
         timestamp = tick["timestamp"]
 
-        bar_interval_seconds = BAR_INTERVAL_MINUTES * 60
-        bar_timestamp = int(timestamp / bar_interval_seconds) * bar_interval_seconds
+        if self.bar_start:
+            bar_timestamp = self.bar_start(timestamp)
+        else:
+            bar_interval_seconds = BAR_INTERVAL_MINUTES * 60
+            bar_timestamp = int(timestamp / bar_interval_seconds) * bar_interval_seconds
 
         # Initialize bar series for new symbol
         if symbol not in self.bar_series:
-            self.bar_series[symbol] = deque(maxlen=200) # Store last 200 bars
+            self.bar_series[symbol] = deque(maxlen=self.BAR_HISTORY)
             self.current_bar[symbol] = {}
 
         # If a new bar interval has started
@@ -51,3 +58,47 @@ class Feed:
             self.current_bar[symbol]["low"] = min(self.current_bar[symbol]["low"], price)
             self.current_bar[symbol]["close"] = price
             yield None # No new bar completed
+
+    def close_bars(self):
+        """
+        Completes the current bar of every symbol without waiting for the next
+        tick (e.g. at a bar boundary or the session close) and yields each
+        symbol's updated bar series.
+        """
+        for symbol, bar in self.current_bar.items():
+            if bar:
+                self.bar_series[symbol].append(bar)
+                self.current_bar[symbol] = {}
+                yield self.bar_series[symbol]
+
+
+def aggregate_bars(timestamps, prices, clock):
+    """
+    Vectorized counterpart of Feed.process_tick and Feed.close_bars: aggregates
+    a whole array of one symbol's ticks into bars anchored to the clock's
+    sessions. Returns arrays of bar start, bar end, open, high, low and close.
+    """
+    step = clock.tick_interval.total_seconds()
+    interval = clock.bar_interval_seconds
+
+    # Ticks are contiguous within a session, so a larger gap starts a new one
+    session_breaks = np.r_[True, np.diff(timestamps) != step]
+    session_ids = np.cumsum(session_breaks) - 1
+    anchors = np.array([clock.bar_start(timestamp) for timestamp in timestamps[session_breaks]])[session_ids]
+    bar_starts = anchors + np.floor((timestamps - anchors) / interval) * interval
+
+    first = np.flatnonzero(np.r_[True, np.diff(bar_starts) != 0])
+    last = np.r_[first[1:] - 1, len(timestamps) - 1]
+    ends = bar_starts[first] + interval
+    # The last bar of each session ends at the session close
+    session_last_bars = np.flatnonzero(np.r_[session_ids[first][1:] != session_ids[first][:-1], True])
+    ends[session_last_bars] = [clock.bar_close(timestamps[last[i]]) for i in session_last_bars]
+
+    return {
+        "timestamp": bar_starts[first],
+        "end": ends,
+        "open": prices[first],
+        "high": np.maximum.reduceat(prices, first),
+        "low": np.minimum.reduceat(prices, first),
+        "close": prices[last]
+    }
@@ -0,0 +1,172 @@
+import math
+import zlib
+import numpy as np
+from scipy.signal import lfilter
+from config import (
+    SYMBOLS, TICK_INTERVAL, MARKET_DATA_MODEL, MARKET_DATA_SEED, MARKET_DATA_BLOCK_SIZE,
+    MARKET_DATA_START_PRICE, MARKET_DATA_PARAMS, REFERENCE_OPTION_EXPIRY_DAYS,
+    REFERENCE_OPTION_VOLATILITY, REFERENCE_OPTION_PREMIUM
+)
+from pricing import price_vanilla_call_vectorized
+
+class SimulatedMarketData:
+    """
+    Simulated market data source standing in for the real API.
+    Ticks are pre-generated in blocks with a seeded NumPy generator, and the
+    reference option is priced for the whole block in a single vectorized call.
+
+    get_tick and get_block read from the same cursor, so they can be mixed,
+    but get_block may only be called once get_tick has served every symbol
+    of the current timestamp.
+    """
+    MODELS = ('GBM', 'JUMP_DIFFUSION', 'STOCHASTIC_VOL', 'MEAN_REVERTING')
+
+    def __init__(self, clock, symbols=SYMBOLS, model=MARKET_DATA_MODEL, seed=MARKET_DATA_SEED,
+                 block_size=MARKET_DATA_BLOCK_SIZE, params=None):
+        if model not in self.MODELS:
+            raise ValueError(f"Unknown market data model '{model}'. Choose one of {self.MODELS}.")
+        self.clock = clock
+        self.symbols = list(symbols)
+        self.model = model
+        self.block_size = block_size
+        self.params = {**MARKET_DATA_PARAMS, **(params or {})}
+        self.dt = TICK_INTERVAL / (365 * 24 * 60 * 60) # Tick interval in years
+
+        # One generator per symbol, keyed by its name, so a symbol's price path
+        # does not depend on which other symbols are simulated alongside it
+        self.rngs = [np.random.default_rng([seed, zlib.crc32(symbol.encode())]) for symbol in self.symbols]
+
+        # Model state carried over from one block to the next
+        self.log_prices = np.full(len(self.symbols), math.log(MARKET_DATA_START_PRICE))
+        self.log_vol_deviation = np.zeros(len(self.symbols))
+
+        # Current block; rows are ticks, columns are symbols. get_tick reads the
+        # list copies, which index and box much faster than NumPy scalars
+        self.block_prices = np.empty((0, len(self.symbols)))
+        self.block_option_prices = np.empty((0, len(self.symbols)))
+        self.price_rows = []
+        self.option_price_rows = []
+        self.block_rows = 0
+        self.row = 0
+        self.symbol_index = 0
+        self.row_timestamp = None
+
+    def get_tick(self):
+        """
+        Returns the next tick in the same format as the live API. With several
+        symbols, one tick per symbol is served before the clock advances.
+        """
+        if self.row >= self.block_rows:
+            self._load_block()
+
+        i = self.symbol_index
+        if i == 0: # Every symbol of a row shares its timestamp
+            self.row_timestamp = self.clock.get_timestamp()
+        row = self.row
+        price = self.price_rows[row][i]
+        tick = {
+            "symbol": self.symbols[i],
+            "timestamp": self.row_timestamp,
+            "price": price,
+            "reference_option_price": self.option_price_rows[row][i],
+            "reference_option_strike": price
+        }
+
+        self.symbol_index += 1
+        if self.symbol_index == len(self.symbols):
+            self.symbol_index = 0
+            self.row = row + 1
+            self.clock.advance()
+        return tick
+
+    def get_block(self, n_ticks=None):
+        """
+        Returns the next n_ticks timestamps at once as arrays: timestamps of shape (n,),
+        prices and reference option prices of shape (n, number of symbols).
+        """
+        if self.symbol_index != 0:
+            raise RuntimeError(
+                f"get_block called after get_tick served only {self.symbol_index} of "
+                f"{len(self.symbols)} symbols at the current timestamp."
+            )
+        n_ticks = n_ticks or self.block_size
+        prices = []
+        option_prices = []
+        remaining = n_ticks
+        while remaining > 0:
+            if self.row >= self.block_rows:
+                self._load_block()
+            stop = min(self.row + remaining, self.block_rows)
+            prices.append(self.block_prices[self.row:stop])
+            option_prices.append(self.block_option_prices[self.row:stop])
+            remaining -= stop - self.row
+            self.row = stop
+
+        prices = np.concatenate(prices)
+        return {
+            "symbols": self.symbols,
+            "timestamp": self.clock.next_timestamps(n_ticks),
+            "price": prices,
+            "reference_option_price": np.concatenate(option_prices),
+            "reference_option_strike": prices
+        }
+
+    def _load_block(self):
+        """Generates the next block of prices and prices its reference options."""
+        log_returns = np.column_stack([self._log_returns(i, self.block_size) for i in range(len(self.symbols))])
+        if self.model == 'MEAN_REVERTING':
+            log_prices = log_returns # Already generated as levels
+        else:
+            log_prices = self.log_prices + np.cumsum(log_returns, axis=0)
+        self.log_prices = log_prices[-1].copy()
+
+        self.block_prices = np.exp(log_prices)
+        T_ref_years = REFERENCE_OPTION_EXPIRY_DAYS / 365.0
+        self.block_option_prices = price_vanilla_call_vectorized(
+            self.block_prices, self.block_prices, T_ref_years, REFERENCE_OPTION_VOLATILITY
+        ) * REFERENCE_OPTION_PREMIUM
+        self.price_rows = self.block_prices.tolist()
+        self.option_price_rows = self.block_option_prices.tolist()
+        self.block_rows = len(self.price_rows)
+        self.row = 0
+
+    def _log_returns(self, i, n):
+        """Draws n log returns (log price levels for MEAN_REVERTING) for symbol i."""
+        rng = self.rngs[i]
+        p = self.params
+        dt = self.dt
+        sigma = p["volatility"]
+        z = rng.standard_normal(n)
+
+        if self.model == 'GBM':
+            return (p["drift"] - 0.5 * sigma**2) * dt + sigma * math.sqrt(dt) * z
+
+        if self.model == 'JUMP_DIFFUSION':
+            # Merton jump diffusion: Poisson number of jumps with normal log jump sizes
+            n_jumps = rng.poisson(p["jump_intensity"] * dt, n)
+            jumps = n_jumps * p["jump_mean"] + np.sqrt(n_jumps) * p["jump_std"] * rng.standard_normal(n)
+            # Compensate the drift so jumps do not change the expected return
+            compensator = p["jump_intensity"] * (math.exp(p["jump_mean"] + 0.5 * p["jump_std"]**2) - 1)
+            return (p["drift"] - compensator - 0.5 * sigma**2) * dt + sigma * math.sqrt(dt) * z + jumps
+
+        if self.model == 'STOCHASTIC_VOL':
+            # Log-volatility follows an Ornstein-Uhlenbeck process around log(volatility),
+            # solved exactly as an AR(1) recursion in a single filter pass
+            kappa = p["vol_mean_reversion"]
+            phi = math.exp(-kappa * dt)
+            vol_shocks = rng.standard_normal(n)
+            innovations = p["vol_of_vol"] * math.sqrt((1 - phi**2) / (2 * kappa)) * vol_shocks
+            deviation, _ = lfilter([1.0], [1.0, -phi], innovations, zi=[phi * self.log_vol_deviation[i]])
+            self.log_vol_deviation[i] = deviation[-1]
+            sigma_t = sigma * np.exp(deviation)
+            rho = p["vol_price_correlation"]
+            price_shocks = rho * vol_shocks + math.sqrt(1 - rho**2) * z
+            return (p["drift"] - 0.5 * sigma_t**2) * dt + sigma_t * math.sqrt(dt) * price_shocks
+
+        # MEAN_REVERTING: log price follows an Ornstein-Uhlenbeck process around the start price
+        kappa = p["mean_reversion_speed"]
+        phi = math.exp(-kappa * dt)
+        long_run_level = math.log(MARKET_DATA_START_PRICE)
+        innovations = sigma * math.sqrt((1 - phi**2) / (2 * kappa)) * z
+        deviation, _ = lfilter([1.0], [1.0, -phi], innovations, zi=[phi * (self.log_prices[i] - long_run_level)])
+        return long_run_level + deviation
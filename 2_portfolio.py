@@ -1,3 +1,5 @@
+from pricing import price_option_order
+
 class Portfolio:
     """
     # The single class for the account's financial status.
@@ -6,6 +8,7 @@ class Portfolio:
         self.initial_capital = initial_capital
         self.cash = initial_capital
         self.positions = {}  # symbol -> position_details
+        self.equity_history = []  # (fill timestamp, cash + open positions marked to market) after every fill
         print(f"Portfolio initialized with starting capital: ${initial_capital:,.2f}")
 
     def can_transact(self, estimated_cost):
@@ -14,20 +17,36 @@ class Portfolio:
         """
         return self.cash >= estimated_cost
 
-    def update_on_fill(self, fill):
+    def mark_to_market(self, timestamp, underlying_prices):
+        """
+        Returns cash plus the current option value of all open positions.
+        underlying_prices maps symbols to their current underlying price; a
+        position without one is valued at the underlying price of its last fill.
         """
-        Updates cash and positions based on a trade execution (fill) object.
+        equity = self.cash
+        for symbol, position in self.positions.items():
+            underlying_price = underlying_prices.get(symbol, position["underlying_price"])
+            equity += price_option_order(position["order_details"], underlying_price, timestamp)
+        return equity
+
+    def update_on_fill(self, fill, underlying_prices=None):
+        """
+        Updates cash and positions based on a trade execution (fill) object,
+        and records the marked-to-market equity at the fill.
+        underlying_prices: optional symbol -> current underlying price, used to mark the other open positions
         """
         order = fill['order']
         symbol = order['symbol']
         
-        if order['direction'] in: # Opening a position
+        if order['direction'] in ('BUY', 'SELL'): # Opening a position
             cost = fill['fill_price'] + fill['fees']
             self.cash -= cost
             self.positions[symbol] = {
                 "entry_price": fill['fill_price'],
+                "underlying_price": fill['underlying_price_at_fill'],
                 "order_details": order # Store all details for re-pricing on exit
             }
+            self._record_equity(fill, underlying_prices)
             print(f"Portfolio Update: OPEN {symbol}. Cost: ${cost:.2f}. Remaining Cash: ${self.cash:,.2f}")
 
         elif order['direction'] == 'CLOSE': # Closing a position
@@ -38,4 +57,10 @@ class Portfolio:
             proceeds = fill['fill_price'] - fill['fees']
             self.cash += proceeds
             del self.positions[symbol]
+            self._record_equity(fill, underlying_prices)
             print(f"Portfolio Update: CLOSE {symbol}. Proceeds: ${proceeds:.2f}. Remaining Cash: ${self.cash:,.2f}")
+
+    def _record_equity(self, fill, underlying_prices):
+        prices = {**(underlying_prices or {}), fill['order']['symbol']: fill['underlying_price_at_fill']}
+        timestamp = fill['fill_timestamp']
+        self.equity_history.append((timestamp, self.mark_to_market(timestamp, prices)))
@@ -1,4 +1,6 @@
 import math
+import numpy as np
+from scipy.special import ndtr
 import py_vollib.black_scholes.implied_volatility as iv
 from config import RISK_FREE_RATE
 
@@ -33,6 +35,16 @@ def price_vanilla_call(S, K, T, sigma):
     price = S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
     return price
 
+def price_vanilla_call_vectorized(S, K, T, sigma):
+    """Prices an array of European calls in one Black-Scholes evaluation (T > 0)."""
+    S = np.asarray(S, dtype=float)
+    K = np.asarray(K, dtype=float)
+    r = RISK_FREE_RATE
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
+    return S * ndtr(d1) - K * np.exp(-r * T) * ndtr(d2)
+
 def price_vanilla_put(S, K, T, sigma):
     """Prices a standard European put option using Black-Scholes."""
     if T <= 0:
@@ -63,3 +75,15 @@ def price_up_and_out_put(S, K, B, T, sigma):
     #Similar rationale for using the reflection_term as above
     reflection_term = (S / B) ** (1 - (2 * r / sigma**2)) * price_vanilla_put(B**2 / S, K, T, sigma)
     return vanilla_price - reflection_term
+
+def price_option_order(order, S, timestamp):
+    """Prices an option order (as created by the Executor) at an underlying price and a Unix timestamp."""
+    remaining_seconds = order['expiry_timestamp'] - timestamp
+    if remaining_seconds <= 0:
+        return 0 # Option expired
+    T_years = remaining_seconds / (365 * 24 * 60 * 60)
+    if order["type"] == "DOWN_AND_OUT_CALL":
+        return price_down_and_out_call(S, order["strike"], order["barrier"], T_years, order["volatility_at_order"])
+    if order["type"] == "UP_AND_OUT_PUT":
+        return price_up_and_out_put(S, order["strike"], order["barrier"], T_years, order["volatility_at_order"])
+    return 0
@@ -1,4 +1,5 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from config import LOOKBACK_PERIOD, STD_DEV_MULTIPLIER, OPTION_EXPIRY_DAYS
 
 class MeanReversionStrategy:
@@ -26,12 +27,16 @@ class MeanReversionStrategy:
         mean = np.mean(previous_closes)
         std = np.std(previous_closes)
 
+        return self.signal_from_bands(bar_series_deque[-2], bar_series_deque[-1], mean, std)
+
+    def signal_from_bands(self, previous_bar, current_bar, mean, std):
+        """
+        Returns the signal for the latest bar, given the mean and standard
+        deviation of the closes before it.
+        """
         upper_band = mean + STD_DEV_MULTIPLIER * std
         lower_band = mean - STD_DEV_MULTIPLIER * std
 
-        current_bar = bar_series_deque[-1]
-        previous_bar = bar_series_deque[-2]
-
         # --- Entry Signals ---
 
         # Buy Signal: Oversold Reversal
@@ -54,6 +59,32 @@ class MeanReversionStrategy:
 
         return None
 
+    def band_series(self, close_prices, history):
+        """
+        Vectorized counterpart of on_bar's indicators: for every bar, the mean and
+        standard deviation of the closes before it, over a bar series holding at
+        most `history` bars. NaN where on_bar would not have enough data.
+        """
+        close_prices = np.asarray(close_prices, dtype=float)
+        n = len(close_prices)
+        window = history - 1 # on_bar excludes the latest bar
+        mean = np.full(n, np.nan)
+        std = np.full(n, np.nan)
+
+        # Series still filling up: all closes so far
+        for i in range(LOOKBACK_PERIOD, min(n, window)):
+            mean[i] = np.mean(close_prices[:i])
+            std[i] = np.std(close_prices[:i])
+
+        # Full series: a sliding window of the previous closes
+        if n > window:
+            windows = sliding_window_view(close_prices, window)[:n - window]
+            start = max(window, LOOKBACK_PERIOD)
+            mean[start:] = windows[start - window:].mean(axis=1)
+            std[start:] = windows[start - window:].std(axis=1)
+
+        return mean, std
+
     def _generate_signal_details(self, current_bar, signal_type, sma, band):
         """
         Creates a detailed signal object with option parameters.
@@ -13,7 +13,7 @@ class Executor:
         """
         Processes a signal from the strategy, calculates IV, and sends an order to the simulator.
         """
-        if signal["signal"] in:
+        if signal["signal"] in ("BUY", "SELL"):
             T_days = signal["expiry_days"]
             underlying_price = current_tick["price"]
             reference_option_price = current_tick["reference_option_price"]
@@ -58,7 +58,7 @@ class Executor:
             print(f"Order Submitted: {order['direction']} {order['symbol']}")
             return self.simulator.execute_order(order, current_tick)
 
-        elif signal["signal"] in:
+        elif signal["signal"] in ("EXIT_LONG", "EXIT_SHORT"):
             # Create an order to close the current position
             close_order = {
                 "direction": "CLOSE", 
@@ -1,6 +1,6 @@
 from collections import deque
 from config import EXECUTION_DELAY_MINUTES, SLIPPAGE_PERCENT, TRANSACTION_FEES
-from pricing import price_down_and_out_call, price_up_and_out_put
+from pricing import price_option_order
 
 class MarketSimulator:
     """
@@ -23,7 +23,7 @@ class MarketSimulator:
         delay_seconds = EXECUTION_DELAY_MINUTES * 60
 
         # Check the first signal in the queue
-        pending_signal = self.pending_signal_queue
+        pending_signal = self.pending_signal_queue[0]
 
         if current_tick["timestamp"] >= pending_signal["signal_timestamp"] + delay_seconds:
             # Time before checking the signal
@@ -56,39 +56,13 @@ class MarketSimulator:
 
             # Retrieve open positions details from portfolio
             position_to_close = self.portfolio.positions[symbol]['order_details']
-            remaining_seconds = position_to_close['expiry_timestamp'] - current_tick['timestamp']
-            if remaining_seconds <= 0:
-                theoretical_price = 0 # Option expired
-            else:
-                T_years = remaining_seconds / (365 * 24 * 60 * 60)
-
-                # Use the correct pricing function with current market data
-                if position_to_close["type"] == "DOWN_AND_OUT_CALL":
-                    theoretical_price = price_down_and_out_call(
-                        execution_underlying_price, position_to_close["strike"], position_to_close["barrier"], T_years, position_to_close["volatility_at_order"]
-                    )
-                elif position_to_close["type"] == "UP_AND_OUT_PUT":
-                    theoretical_price = price_up_and_out_put(
-                        execution_underlying_price, position_to_close["strike"], position_to_close["barrier"], T_years, position_to_close["volatility_at_order"]
-                    )
-                else:
-                    theoretical_price = 0
+            # Use the correct pricing function with current market data
+            theoretical_price = price_option_order(position_to_close, execution_underlying_price, current_tick['timestamp'])
 
             final_price = theoretical_price * (1 - SLIPPAGE_PERCENT)
         else:
             # Re-price the option at the new underlying price
-            T_years = (order['expiry_timestamp'] - current_tick['timestamp']) / (365 * 24 * 60 * 60) # Time in years
-            
-            if order["type"] == "DOWN_AND_OUT_CALL":
-                theoretical_price = price_down_and_out_call(
-                    execution_underlying_price, order["strike"], order["barrier"], T_years, order["volatility_at_order"]
-                )
-            elif order["type"] == "UP_AND_OUT_PUT":
-                theoretical_price = price_up_and_out_put(
-                    execution_underlying_price, order["strike"], order["barrier"], T_years, order["volatility_at_order"]
-                )
-            else:
-                theoretical_price = 0 # Fallback for unknown types
+            theoretical_price = price_option_order(order, execution_underlying_price, current_tick['timestamp'])
 
             # Handle BUY orders
             if order["direction"] == "BUY":
@@ -1,69 +1,107 @@
 import datetime
-import random
 
 # Import custom modules
-from config import SYMBOLS, RISK_FREE_RATE
+from config import SYMBOLS, TICK_INTERVAL, INITIAL_CAPITAL, BACKTEST_DAYS, EXECUTION_DELAY_MINUTES, EXECUTION_MODE
 from feed import Feed
+from market_data import SimulatedMarketData
 from portfolio import Portfolio
-from pricing import price_vanilla_call
 from strategy import MeanReversionStrategy
 from execution import Executor
 from market_conditions import MarketSimulator
 from log import Logger
+from scheduler import TradingCalendar, SessionClock, EventScheduler, TICK, BAR_CLOSE, SIGNAL_CHECK, OPTION_EXPIRY
+from parallel import run_sharded_backtest
+from research import run_research_backtest
+from results import ResultsStore
 import analysis
 
-class SimulatedClock:
-    """
-    Manages time passed in the backtest simulation
-    """
-    def __init__(self, start_date, tick_interval_seconds):
-        self.current_time = start_date
-        self.tick_interval = datetime.timedelta(seconds=tick_interval_seconds)
-
-    def get_timestamp(self):
-        """Returns the current simulated time as a Unix timestamp."""
-        return self.current_time.timestamp()
 
-    def advance(self):
-        """Moves the clock forward by one tick interval."""
-        self.current_time += self.tick_interval
-
-# --- Mock API Client for Demonstration ---
-class MockApiClient:
+def run_backtest(start_date, end_timestamp):
     """
-    A mock API client to simulate fetching live tick data.
+    Runs the backtest in a single process and returns the final portfolio and logger.
     """
+    calendar = TradingCalendar()
+    sim_clock = SessionClock(calendar, start_date, TICK_INTERVAL)
+    scheduler = EventScheduler(end_timestamp, align=sim_clock.align)
+
+    # 1. Initialize all components
+    api_client = SimulatedMarketData(sim_clock)
+    feed = Feed(api_client, bar_start=sim_clock.bar_start)
+    portfolio = Portfolio(initial_capital=INITIAL_CAPITAL)
+    strategy = MeanReversionStrategy()
+    market_sim = MarketSimulator(strategy, portfolio)
+    executor = Executor(market_sim, portfolio)
+    logger = Logger()
+    current_ticks = {} # symbol -> latest tick
+
+    def latest_prices():
+        return {symbol: tick["price"] for symbol, tick in current_ticks.items()}
+
+    def on_completed_bar(completed_bar_series):
+        # New bar formed — check for a trading signal
+        signal = strategy.on_bar(completed_bar_series)
+        if not signal:
+            return
+        # Exits are executed straight away, entries are sent to be checked first
+        if "EXIT" in signal["signal"]:
+            fill = executor.process_signal(signal, current_ticks[signal["symbol"]])
+            if fill:
+                portfolio.update_on_fill(fill, latest_prices())
+                logger.log_trade_close(fill)
+        else:
+            market_sim.submit_signal_for_check(signal)
+            scheduler.schedule_at_tick(signal["signal_timestamp"] + EXECUTION_DELAY_MINUTES * 60, SIGNAL_CHECK)
+
+    # 2. Main Backtest Loop: jump from one event to the next
+    scheduler.schedule(sim_clock.get_timestamp(), TICK)
+    scheduler.schedule(sim_clock.bar_close(sim_clock.get_timestamp()), BAR_CLOSE)
+    while scheduler and scheduler.next_time() < end_timestamp:
+        timestamp, event_type, payload = scheduler.pop()
+
+        if event_type == TICK:
+            # A. Get the latest market data, one tick per symbol
+            for _ in SYMBOLS:
+                current_tick = api_client.get_tick()
+                current_ticks[current_tick["symbol"]] = current_tick
+
+                # B. Process the tick into bars (Feed yields completed bar series)
+                for completed_bar_series in feed.process_tick(current_tick):
+                    if completed_bar_series:
+                        on_completed_bar(completed_bar_series)
+
+            # The clock has already skipped any non-trading time
+            scheduler.schedule(sim_clock.get_timestamp(), TICK)
+
+        elif event_type == BAR_CLOSE:
+            # C. Close bars on time, so the last bar of a session does not wait for the next open
+            for completed_bar_series in feed.close_bars():
+                on_completed_bar(completed_bar_series)
+            scheduler.schedule(sim_clock.bar_close(sim_clock.get_timestamp()), BAR_CLOSE)
+
+        elif event_type == SIGNAL_CHECK:
+            # D. Re-check a pending signal once the execution delay has passed
+            symbol = market_sim.pending_signal_queue[0]["symbol"]
+            validated_signal = market_sim.process_pending_signal(current_ticks[symbol], feed.bar_series[symbol])
+            if validated_signal:
+                # If signal is validated, process for execution
+                fill = executor.process_signal(validated_signal, current_ticks[symbol])
+                if fill:
+                    portfolio.update_on_fill(fill, latest_prices())
+                    logger.log_trade_open(fill)
+                    scheduler.schedule_at_tick(fill["order"]["expiry_timestamp"], OPTION_EXPIRY, fill["order"])
+
+        elif event_type == OPTION_EXPIRY:
+            # E. Close positions still open at expiry
+            order = payload
+            position = portfolio.positions.get(order["symbol"])
+            if position and position["order_details"] is order:
+                exit_signal = "EXIT_LONG" if order["direction"] == "BUY" else "EXIT_SHORT"
+                fill = executor.process_signal({"signal": exit_signal, "symbol": order["symbol"]}, current_ticks[order["symbol"]])
+                if fill:
+                    portfolio.update_on_fill(fill, latest_prices())
+                    logger.log_trade_close(fill)
 
-    def __init__(self, clock):
-        # Initialize each symbol with a base price of 100
-        self.prices = {symbol: 100.0 for symbol in SYMBOLS}
-        self.clock = clock
-
-    def get_price(self, symbol):
-        price = self.prices[symbol]
-        # Apply small random fluctuation to simulate tick change
-        price *= (1 + random.uniform(-0.001, 0.001))
-        self.prices[symbol] = price
-        return price
-
-    def get_tick(self):
-        symbol = SYMBOLS
-        underlying_price = self.get_price(symbol)
-        T_ref_years = 2 / 365.0
-        sigma_ref = 0.2 # Assumed "true" volatility of ATM option
-        reference_option_price = price_vanilla_call(underlying_price, underlying_price, T_ref_years, sigma_ref) * 1.02
-
-        # Advance the clock
-        timestamp = self.clock.get_timestamp()
-        self.clock.advance()
-        
-        return {
-            "symbol": symbol,
-            "timestamp": timestamp,
-            "price": underlying_price,
-            "reference_option_price": reference_option_price,
-            "reference_option_strike": underlying_price
-        }
+    return portfolio, logger
 
 
 def main():
@@ -85,59 +123,19 @@ def main():
         except ValueError:
             print("--- Invalid date format. Please use YYYY-MM-DD. Try again. ---")
 
-    sim_clock = SimulatedClock(start_date, TICK_INTERVAL)
-    end_date = start_date + datetime.timedelta(days=15)
-    
-    # 1. Initialize all components
-    api_client = MockApiClient(sim_clock)
-    feed = Feed(api_client)
-    portfolio = Portfolio(initial_capital=INITIAL_CAPITAL)
-    strategy = MeanReversionStrategy()
-    market_sim = MarketSimulator(strategy, portfolio)
-    executor = Executor(market_sim, portfolio)
-    logger = Logger()
+    end_timestamp = (start_date + datetime.timedelta(days=BACKTEST_DAYS)).timestamp()
+    if EXECUTION_MODE == 'SHARDED':
+        portfolio, logger = run_sharded_backtest(start_date, end_timestamp)
+    elif EXECUTION_MODE == 'RESEARCH':
+        portfolio, logger = run_research_backtest(start_date, end_timestamp)
+    else:
+        portfolio, logger = run_backtest(start_date, end_timestamp)
 
-    # 2. Main Backtest Loop
-    while sim_clock.current_time < end_date:
-        # A. Get the latest market data
-        current_tick = api_client.get_tick()
-
-        # B. Process the tick into bars (Feed yields completed bar series)
-        for completed_bar_series in feed.process_tick(current_tick):
-            if completed_bar_series:
-
-                # C. New bar formed — check for a trading signal
-                signal = strategy.on_bar(completed_bar_series)
-                if signal:
-                    # D. Send signal to be checked first
-                    if "EXIT" in signal["signal"]:
-                        fill = executor.process_signal(signal, current_tick)
-                        if fill:
-                            portfolio.update_on_fill(fill)
-                            logger.log_trade_close(fill)
-                    else:
-                        market_sim.submit_signal_for_check(signal)
-
-        # E. Check if any pending signals are ready to be checked
-        current_bars = feed.bar_series.get(SYMBOLS)
-        if current_bars:
-            validated_signal = market_sim.process_pending_signal(checked_signal, current_tick)
-            if validated_signal:
-                # If signal is validated, process for execution
-                fill = executor.process_signal(validated_signal, current_tick)
-                if fill:
-                    portfolio.update_on_fill(fill)
-                    # Log the executed trade
-                    if fill['order']['direction'] in:
-                        logger.log_trade_open(fill)
-                    elif fill['order']['direction'] == 'CLOSE':
-                        logger.log_trade_close(fill)
-
-        
     print("\nBacktest finished.")
 
-    # 3. Run final performance analysis
-    analysis.run_analysis(portfolio, logger.log_file_path)
+    # 3. Run final performance analysis and keep the results of the run
+    metrics = analysis.run_analysis(portfolio, logger.log_file_path)
+    ResultsStore().append_run(logger.closed_trades, portfolio.equity_history, metrics)
 
 
 if __name__ == "__main__":
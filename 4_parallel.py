@@ -0,0 +1,371 @@
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+
+from config import (
+    SYMBOLS, TICK_INTERVAL, INITIAL_CAPITAL, EXECUTION_DELAY_MINUTES, OPTION_EXPIRY_DAYS,
+    NUM_WORKERS, BAR_BUFFER_SIZE, SIGNAL_BUFFER_SIZE
+)
+from feed import Feed
+from market_data import SimulatedMarketData
+from portfolio import Portfolio
+from strategy import MeanReversionStrategy
+from execution import Executor
+from market_conditions import MarketSimulator
+from log import Logger
+from scheduler import TradingCalendar, SessionClock, EventScheduler, BAR_CLOSE, SIGNAL_CHECK, OPTION_EXPIRY
+
+# Columns of a bar record in the shared bar ring buffers
+BAR_START, BAR_END, BAR_OPEN, BAR_HIGH, BAR_LOW, BAR_CLOSE_PRICE, BAR_REF_OPTION_PRICE = range(7)
+BAR_FIELDS = 7
+
+# Signal records in the shared signal ring buffers
+SIGNAL_DTYPE = np.dtype([
+    ("event_time", "f8"), # Close time of the bar that produced the signal
+    ("symbol", "i4"), # Index into SYMBOLS
+    ("code", "i1"), # Index into SIGNAL_CODES
+    ("signal_timestamp", "f8"),
+    ("strike_price", "f8"),
+    ("barrier_price", "f8"),
+    ("signal_price", "f8"),
+])
+SIGNAL_CODES = ("BUY", "SELL", "EXIT_LONG", "EXIT_SHORT")
+OPTION_TYPES = {"BUY": "DOWN_AND_OUT_CALL", "SELL": "UP_AND_OUT_PUT"}
+
+# Slots of the per-worker control block; bar counts per symbol follow
+SIGNALS_WRITTEN, SIGNALS_READ, WORKER_WATERMARK, CENTRAL_WATERMARK, WORKER_DONE = range(5)
+CONTROL_FIELDS = 5
+
+# Keep enough unconsumed room in each bar ring for the bar history the strategy reads
+MAX_WORKER_LEAD_BARS = BAR_BUFFER_SIZE - Feed.BAR_HISTORY - 16
+
+
+def shard_symbols(symbols, n_workers):
+    """Splits symbols into at most n_workers contiguous shards of (global index, symbol) pairs."""
+    indexed = list(enumerate(symbols))
+    n_workers = max(1, min(n_workers, len(indexed)))
+    size, extra = divmod(len(indexed), n_workers)
+    shards = []
+    start = 0
+    for i in range(n_workers):
+        stop = start + size + (1 if i < extra else 0)
+        shards.append(indexed[start:stop])
+        start = stop
+    return shards
+
+
+class ShardBuffers:
+    """
+    Shared-memory ring buffers of one shard: completed bars per symbol,
+    signals in production order, and a small control block of counters
+    and watermarks that the worker and the central process use to hand off.
+    """
+    def __init__(self, n_symbols, names=None):
+        self.n_symbols = n_symbols
+        bar_bytes = n_symbols * BAR_BUFFER_SIZE * BAR_FIELDS * 8
+        signal_bytes = SIGNAL_BUFFER_SIZE * SIGNAL_DTYPE.itemsize
+        control_bytes = (CONTROL_FIELDS + n_symbols) * 8
+        if names is None: # Owner: create the segments
+            self.segments = [
+                shared_memory.SharedMemory(create=True, size=bar_bytes),
+                shared_memory.SharedMemory(create=True, size=signal_bytes),
+                shared_memory.SharedMemory(create=True, size=control_bytes),
+            ]
+        else: # Worker: attach to existing segments
+            self.segments = [shared_memory.SharedMemory(name=name) for name in names]
+        bar_shm, signal_shm, control_shm = self.segments
+        self.bars = np.ndarray((n_symbols, BAR_BUFFER_SIZE, BAR_FIELDS), dtype=np.float64, buffer=bar_shm.buf)
+        self.signals = np.ndarray((SIGNAL_BUFFER_SIZE,), dtype=SIGNAL_DTYPE, buffer=signal_shm.buf)
+        self.control = np.ndarray((CONTROL_FIELDS + n_symbols,), dtype=np.float64, buffer=control_shm.buf)
+        if names is None:
+            self.control[:] = 0
+
+    @property
+    def names(self):
+        return [segment.name for segment in self.segments]
+
+    def bar_count(self, local_index):
+        return int(self.control[CONTROL_FIELDS + local_index])
+
+    def close(self, unlink=False):
+        # Drop the array views first, the segments cannot close while they are exported
+        del self.bars, self.signals, self.control
+        for segment in self.segments:
+            segment.close()
+            if unlink:
+                segment.unlink()
+
+
+def _run_shard(shard, buffer_names, start_date, end_timestamp):
+    """
+    Worker process: runs Feed and strategy for one shard of symbols and
+    publishes completed bars and signals to the shard's shared buffers.
+    """
+    symbols = [symbol for _, symbol in shard]
+    global_index = [index for index, _ in shard]
+    buffers = ShardBuffers(len(shard), buffer_names)
+    bars, control = buffers.bars, buffers.control
+
+    calendar = TradingCalendar()
+    sim_clock = SessionClock(calendar, start_date, TICK_INTERVAL)
+    api_client = SimulatedMarketData(sim_clock, symbols=symbols)
+    feed = Feed(api_client, bar_start=sim_clock.bar_start)
+    strategy = MeanReversionStrategy()
+    local_index = {symbol: i for i, symbol in enumerate(symbols)}
+    last_ref_option_prices = np.zeros(len(symbols))
+    unconsumed_bar_ends = deque() # Bar closes published but not yet passed by the central process
+
+    def publish(bar_end):
+        # Hold back while too many bars ahead of the central process, so the
+        # ring never overwrites bars it may still read
+        while True:
+            while unconsumed_bar_ends and unconsumed_bar_ends[0] <= control[CENTRAL_WATERMARK]:
+                unconsumed_bar_ends.popleft()
+            if len(unconsumed_bar_ends) < MAX_WORKER_LEAD_BARS:
+                break
+            time.sleep(0.001)
+        unconsumed_bar_ends.append(bar_end)
+
+        for completed_bar_series in feed.close_bars():
+            bar = completed_bar_series[-1]
+            i = local_index[bar["symbol"]]
+            count = int(control[CONTROL_FIELDS + i])
+            bars[i, count % BAR_BUFFER_SIZE] = (
+                bar["timestamp"], bar_end, bar["open"], bar["high"], bar["low"], bar["close"], last_ref_option_prices[i]
+            )
+            control[CONTROL_FIELDS + i] = count + 1
+
+            signal = strategy.on_bar(completed_bar_series)
+            if signal:
+                while control[SIGNALS_WRITTEN] - control[SIGNALS_READ] >= SIGNAL_BUFFER_SIZE:
+                    time.sleep(0.001)
+                written = int(control[SIGNALS_WRITTEN])
+                buffers.signals[written % SIGNAL_BUFFER_SIZE] = (
+                    bar_end, global_index[i], SIGNAL_CODES.index(signal["signal"]),
+                    bar["timestamp"], signal.get("strike_price", 0.0), signal.get("barrier_price", 0.0), bar["close"]
+                )
+                control[SIGNALS_WRITTEN] = written + 1
+
+        # Everything up to bar_end is now published
+        control[WORKER_WATERMARK] = bar_end
+
+    next_bar_close = sim_clock.bar_close(sim_clock.get_timestamp())
+    # Read no ticks past the end, so the clock never needs sessions beyond it
+    remaining = sim_clock.ticks_until(end_timestamp)
+    while remaining > 0:
+        block = api_client.get_block(min(remaining, api_client.block_size))
+        remaining -= len(block["timestamp"])
+        for row, timestamp in enumerate(block["timestamp"]):
+            # A bar is closed before the next tick opens a new one
+            if timestamp >= next_bar_close:
+                publish(next_bar_close)
+                next_bar_close = sim_clock.bar_close(timestamp)
+
+            prices = block["price"][row]
+            for i, symbol in enumerate(symbols):
+                for _ in feed.process_tick({"symbol": symbol, "timestamp": timestamp, "price": prices[i]}):
+                    pass # Bars are closed on schedule above, never by a tick
+            last_ref_option_prices[:] = block["reference_option_price"][row]
+
+    if next_bar_close < end_timestamp:
+        publish(next_bar_close)
+    control[WORKER_WATERMARK] = end_timestamp
+    control[WORKER_DONE] = 1
+    buffers.close()
+
+
+class ShardedBacktest:
+    """
+    Central process of a sharded backtest. Worker processes each run Feed and
+    strategy for a shard of SYMBOLS; this process owns Portfolio,
+    MarketSimulator and Logger and consumes the published signals in
+    timestamp order. Events are only handled once every worker has published
+    past them, so fills do not depend on the number of workers.
+
+    Without the ticks themselves, orders are filled at the close of the
+    symbol's last completed bar.
+    """
+    def __init__(self, start_date, end_timestamp, symbols=SYMBOLS, n_workers=NUM_WORKERS):
+        if MAX_WORKER_LEAD_BARS <= 0:
+            raise ValueError(f"BAR_BUFFER_SIZE must exceed {Feed.BAR_HISTORY + 16} bars.")
+        self.start_date = start_date
+        self.end_timestamp = end_timestamp
+        self.symbols = list(symbols)
+        self.shards = shard_symbols(self.symbols, n_workers)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.location = {} # global symbol index -> (shard index, local index)
+        for shard_index, shard in enumerate(self.shards):
+            for local_index, (index, _) in enumerate(shard):
+                self.location[index] = (shard_index, local_index)
+
+        self.sim_clock = SessionClock(TradingCalendar(), start_date, TICK_INTERVAL)
+        self.scheduler = EventScheduler(end_timestamp, align=self.sim_clock.align)
+        self.portfolio = Portfolio(initial_capital=INITIAL_CAPITAL)
+        self.strategy = MeanReversionStrategy()
+        self.market_sim = MarketSimulator(self.strategy, self.portfolio)
+        self.executor = Executor(self.market_sim, self.portfolio)
+        self.logger = Logger()
+
+    def run(self):
+        """Runs the backtest and returns the final portfolio and logger."""
+        buffers = [ShardBuffers(len(shard)) for shard in self.shards]
+        for shard_buffers in buffers:
+            shard_buffers.control[WORKER_WATERMARK] = self.sim_clock.get_timestamp()
+            shard_buffers.control[CENTRAL_WATERMARK] = self.sim_clock.get_timestamp()
+        workers = [
+            multiprocessing.Process(
+                target=_run_shard, args=(shard, shard_buffers.names, self.start_date, self.end_timestamp), daemon=True
+            )
+            for shard, shard_buffers in zip(self.shards, buffers)
+        ]
+        print(f"Running {len(self.symbols)} symbols across {len(workers)} worker processes...")
+        try:
+            for worker in workers:
+                worker.start()
+            self._consume(buffers, workers)
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            for shard_buffers in buffers:
+                shard_buffers.close(unlink=True)
+        return self.portfolio, self.logger
+
+    def _consume(self, buffers, workers):
+        incoming = [] # Signal records read but not yet safe to order
+        while True:
+            for worker in workers:
+                if worker.exitcode not in (None, 0):
+                    raise RuntimeError(f"Shard worker exited with code {worker.exitcode}.")
+
+            # Workers publish signals, then their watermark, then the done flag; read in
+            # reverse so every signal up to the watermark is included
+            done = all(shard_buffers.control[WORKER_DONE] for shard_buffers in buffers)
+            watermark = min(shard_buffers.control[WORKER_WATERMARK] for shard_buffers in buffers)
+            for shard_buffers in buffers:
+                control = shard_buffers.control
+                read, written = int(control[SIGNALS_READ]), int(control[SIGNALS_WRITTEN])
+                if written > read:
+                    positions = np.arange(read, written) % SIGNAL_BUFFER_SIZE
+                    incoming.extend(shard_buffers.signals[positions].tolist())
+                    control[SIGNALS_READ] = written
+
+            # All workers are past the watermark, so these are complete; order them deterministically
+            ready = sorted(record for record in incoming if record[0] <= watermark)
+            incoming = [record for record in incoming if record[0] > watermark]
+            for record in ready:
+                self.scheduler.schedule(record[0], BAR_CLOSE, record)
+
+            while self.scheduler and self.scheduler.next_time() <= min(watermark, self.end_timestamp):
+                timestamp, event_type, payload = self.scheduler.pop()
+                if timestamp >= self.end_timestamp:
+                    continue
+                self._handle_event(timestamp, event_type, payload, buffers)
+
+            for shard_buffers in buffers:
+                shard_buffers.control[CENTRAL_WATERMARK] = watermark
+            if done:
+                return
+            time.sleep(0.0005)
+
+    def _handle_event(self, timestamp, event_type, payload, buffers):
+        if event_type == BAR_CLOSE:
+            # A worker produced a signal at this bar close
+            event_time, symbol_index, code, signal_timestamp, strike, barrier, signal_price = payload
+            symbol = self.symbols[symbol_index]
+            signal_type = SIGNAL_CODES[code]
+            current_tick = self._tick_at(symbol_index, timestamp, buffers)
+            if "EXIT" in signal_type:
+                fill = self.executor.process_signal({"signal": signal_type, "symbol": symbol}, current_tick)
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(timestamp, buffers))
+                    self.logger.log_trade_close(fill)
+            else:
+                signal = {
+                    "signal": signal_type,
+                    "symbol": symbol,
+                    "option_type": OPTION_TYPES[signal_type],
+                    "strike_price": strike,
+                    "barrier_price": barrier,
+                    "expiry_days": OPTION_EXPIRY_DAYS,
+                    "signal_price": signal_price,
+                    "signal_timestamp": signal_timestamp
+                }
+                self.market_sim.submit_signal_for_check(signal)
+                self.scheduler.schedule_at_tick(signal_timestamp + EXECUTION_DELAY_MINUTES * 60, SIGNAL_CHECK)
+
+        elif event_type == SIGNAL_CHECK:
+            symbol = self.market_sim.pending_signal_queue[0]["symbol"]
+            symbol_index = self.symbol_index[symbol]
+            current_tick = self._tick_at(symbol_index, timestamp, buffers)
+            bar_series = self._bar_series(symbol_index, timestamp, buffers)
+            validated_signal = self.market_sim.process_pending_signal(current_tick, bar_series)
+            if validated_signal:
+                fill = self.executor.process_signal(validated_signal, current_tick)
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(timestamp, buffers))
+                    self.logger.log_trade_open(fill)
+                    self.scheduler.schedule_at_tick(fill["order"]["expiry_timestamp"], OPTION_EXPIRY, fill["order"])
+
+        elif event_type == OPTION_EXPIRY:
+            order = payload
+            position = self.portfolio.positions.get(order["symbol"])
+            if position and position["order_details"] is order:
+                exit_signal = "EXIT_LONG" if order["direction"] == "BUY" else "EXIT_SHORT"
+                current_tick = self._tick_at(self.symbol_index[order["symbol"]], timestamp, buffers)
+                fill = self.executor.process_signal({"signal": exit_signal, "symbol": order["symbol"]}, current_tick)
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(timestamp, buffers))
+                    self.logger.log_trade_close(fill)
+
+    def _completed_bars(self, symbol_index, timestamp, buffers):
+        """Returns the bar records of a symbol completed by a timestamp, oldest first."""
+        shard_index, local_index = self.location[symbol_index]
+        shard_buffers = buffers[shard_index]
+        count = shard_buffers.bar_count(local_index)
+        available = min(count, BAR_BUFFER_SIZE)
+        records = shard_buffers.bars[local_index, np.arange(count - available, count) % BAR_BUFFER_SIZE]
+        end = np.searchsorted(records[:, BAR_END], timestamp, side="right")
+        return records[max(0, end - Feed.BAR_HISTORY):end]
+
+    def _bar_series(self, symbol_index, timestamp, buffers):
+        """Rebuilds the bar series Feed would hold for a symbol at a timestamp."""
+        symbol = self.symbols[symbol_index]
+        return deque(
+            ({
+                "timestamp": record[BAR_START],
+                "open": record[BAR_OPEN],
+                "high": record[BAR_HIGH],
+                "low": record[BAR_LOW],
+                "close": record[BAR_CLOSE_PRICE],
+                "symbol": symbol
+            } for record in self._completed_bars(symbol_index, timestamp, buffers).tolist()),
+            maxlen=Feed.BAR_HISTORY
+        )
+
+    def _position_prices(self, timestamp, buffers):
+        """Current underlying prices of the symbols with open positions."""
+        return {
+            symbol: self._tick_at(self.symbol_index[symbol], timestamp, buffers)["price"]
+            for symbol in self.portfolio.positions
+        }
+
+    def _tick_at(self, symbol_index, timestamp, buffers):
+        """Builds a tick at a timestamp from the close of the symbol's last completed bar."""
+        record = self._completed_bars(symbol_index, timestamp, buffers)[-1]
+        return {
+            "symbol": self.symbols[symbol_index],
+            "timestamp": timestamp,
+            "price": float(record[BAR_CLOSE_PRICE]),
+            "reference_option_price": float(record[BAR_REF_OPTION_PRICE]),
+            "reference_option_strike": float(record[BAR_CLOSE_PRICE])
+        }
+
+
+def run_sharded_backtest(start_date, end_timestamp):
+    """Runs the backtest with SYMBOLS split across NUM_WORKERS processes."""
+    return ShardedBacktest(start_date, end_timestamp).run()
@@ -0,0 +1,186 @@
+import hashlib
+from collections import deque
+import numpy as np
+
+from config import (
+    SYMBOLS, TICK_INTERVAL, INITIAL_CAPITAL, EXECUTION_DELAY_MINUTES, BAR_INTERVAL_MINUTES,
+    LOOKBACK_PERIOD, STD_DEV_MULTIPLIER, CALENDAR_FILE
+)
+from cache import SeriesCache
+from feed import Feed, aggregate_bars
+from market_data import SimulatedMarketData
+from portfolio import Portfolio
+from strategy import MeanReversionStrategy
+from execution import Executor
+from market_conditions import MarketSimulator
+from log import Logger
+from scheduler import TradingCalendar, SessionClock, EventScheduler, BAR_CLOSE, SIGNAL_CHECK, OPTION_EXPIRY
+
+
+class ResearchBacktest:
+    """
+    Backtest for repeated research runs. Bars and Bollinger series are taken
+    from the on-disk SeriesCache when the same ticks were aggregated before
+    with the same bar and indicator parameters, so a run that only changes
+    execution parameters (e.g. SLIPPAGE_PERCENT, EXECUTION_DELAY_MINUTES)
+    goes straight to signal and execution logic. Events are handled as in the
+    single-process backtest, so both give the same fills.
+    """
+    def __init__(self, start_date, end_timestamp, cache=None):
+        self.end_timestamp = end_timestamp
+        self.cache = cache or SeriesCache()
+        self.calendar = TradingCalendar()
+        self.sim_clock = SessionClock(self.calendar, start_date, TICK_INTERVAL)
+        self.api_client = SimulatedMarketData(self.sim_clock)
+        self.scheduler = EventScheduler(end_timestamp, align=self.sim_clock.align)
+        self.portfolio = Portfolio(initial_capital=INITIAL_CAPITAL)
+        self.strategy = MeanReversionStrategy()
+        self.market_sim = MarketSimulator(self.strategy, self.portfolio)
+        self.executor = Executor(self.market_sim, self.portfolio)
+        self.logger = Logger()
+        self.symbol_index = {symbol: i for i, symbol in enumerate(SYMBOLS)}
+        with open(CALENDAR_FILE, 'rb') as f:
+            self.calendar_hash = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+    def run(self):
+        """Runs the backtest and returns the final portfolio and logger."""
+        self._load_ticks()
+        self.bars = []
+        for i, symbol in enumerate(SYMBOLS):
+            bars, mean, std = self._bars_and_bands(i)
+            self.bars.append(bars)
+            self._schedule_signals(symbol, bars, mean, std)
+
+        while self.scheduler and self.scheduler.next_time() < self.end_timestamp:
+            timestamp, event_type, payload = self.scheduler.pop()
+            self._handle_event(timestamp, event_type, payload)
+        return self.portfolio, self.logger
+
+    def _load_ticks(self):
+        # Raw ticks of the whole period; none past the end, so the clock never
+        # needs sessions beyond it
+        block = self.api_client.get_block(self.sim_clock.ticks_until(self.end_timestamp))
+        self.timestamps = block["timestamp"]
+        self.prices = block["price"]
+        self.option_prices = block["reference_option_price"]
+
+    def _bars_and_bands(self, i):
+        """Returns the bars of a symbol and their Bollinger mean and std, from the cache when possible."""
+        prices = np.ascontiguousarray(self.prices[:, i])
+        bars = self.cache.get_or_compute(
+            "bars",
+            {"timestamp": self.timestamps, "price": prices},
+            {"tick_interval": TICK_INTERVAL, "bar_interval_minutes": BAR_INTERVAL_MINUTES, "calendar": self.calendar_hash},
+            lambda: aggregate_bars(self.timestamps, prices, self.sim_clock),
+            code=(aggregate_bars, SessionClock)
+        )
+        bands = self.cache.get_or_compute(
+            "bollinger",
+            {"close": bars["close"]},
+            {"history": Feed.BAR_HISTORY, "lookback": LOOKBACK_PERIOD},
+            lambda: dict(zip(("mean", "std"), self.strategy.band_series(bars["close"], Feed.BAR_HISTORY))),
+            code=(MeanReversionStrategy.band_series,)
+        )
+        return bars, bands["mean"], bands["std"]
+
+    def _schedule_signals(self, symbol, bars, mean, std):
+        # Only bars that cross a band or the mean can produce a signal
+        close = np.asarray(bars["close"])
+        previous, current = close[:-1], close[1:]
+        upper = (mean + STD_DEV_MULTIPLIER * std)[1:]
+        lower = (mean - STD_DEV_MULTIPLIER * std)[1:]
+        middle = mean[1:]
+        crossed = (
+            ((previous < lower) & (current > lower)) | ((previous > upper) & (current < upper)) |
+            ((previous <= middle) & (current > middle)) | ((previous >= middle) & (current < middle))
+        )
+        for i in np.flatnonzero(crossed) + 1:
+            if bars["end"][i] >= self.end_timestamp:
+                break
+            signal = self.strategy.signal_from_bands(
+                self._bar(symbol, bars, i - 1), self._bar(symbol, bars, i), mean[i], std[i]
+            )
+            if signal:
+                self.scheduler.schedule(float(bars["end"][i]), BAR_CLOSE, signal)
+
+    def _handle_event(self, timestamp, event_type, payload):
+        if event_type == BAR_CLOSE:
+            # The bar that produced the signal has just closed
+            signal = payload
+            if "EXIT" in signal["signal"]:
+                fill = self.executor.process_signal(signal, self._tick_before(signal["symbol"], timestamp))
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(self._tick_before, timestamp))
+                    self.logger.log_trade_close(fill)
+            else:
+                self.market_sim.submit_signal_for_check(signal)
+                self.scheduler.schedule_at_tick(signal["signal_timestamp"] + EXECUTION_DELAY_MINUTES * 60, SIGNAL_CHECK)
+
+        elif event_type == SIGNAL_CHECK:
+            symbol = self.market_sim.pending_signal_queue[0]["symbol"]
+            current_tick = self._tick_at(symbol, timestamp)
+            validated_signal = self.market_sim.process_pending_signal(current_tick, self._bar_series(symbol, timestamp))
+            if validated_signal:
+                fill = self.executor.process_signal(validated_signal, current_tick)
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(self._tick_at, timestamp))
+                    self.logger.log_trade_open(fill)
+                    self.scheduler.schedule_at_tick(fill["order"]["expiry_timestamp"], OPTION_EXPIRY, fill["order"])
+
+        elif event_type == OPTION_EXPIRY:
+            order = payload
+            position = self.portfolio.positions.get(order["symbol"])
+            if position and position["order_details"] is order:
+                exit_signal = "EXIT_LONG" if order["direction"] == "BUY" else "EXIT_SHORT"
+                current_tick = self._tick_at(order["symbol"], timestamp)
+                fill = self.executor.process_signal({"signal": exit_signal, "symbol": order["symbol"]}, current_tick)
+                if fill:
+                    self.portfolio.update_on_fill(fill, self._position_prices(self._tick_at, timestamp))
+                    self.logger.log_trade_close(fill)
+
+    def _bar(self, symbol, bars, i):
+        return {
+            "timestamp": float(bars["timestamp"][i]),
+            "open": float(bars["open"][i]),
+            "high": float(bars["high"][i]),
+            "low": float(bars["low"][i]),
+            "close": float(bars["close"][i]),
+            "symbol": symbol
+        }
+
+    def _bar_series(self, symbol, timestamp):
+        """Rebuilds the bar series Feed would hold for a symbol at a timestamp."""
+        bars = self.bars[self.symbol_index[symbol]]
+        end = np.searchsorted(bars["end"], timestamp, side="right")
+        return deque(
+            (self._bar(symbol, bars, i) for i in range(max(0, end - Feed.BAR_HISTORY), end)),
+            maxlen=Feed.BAR_HISTORY
+        )
+
+    def _position_prices(self, tick_lookup, timestamp):
+        """Current underlying prices of the symbols with open positions."""
+        return {symbol: tick_lookup(symbol, timestamp)["price"] for symbol in self.portfolio.positions}
+
+    def _tick_at(self, symbol, timestamp):
+        """The tick at a timestamp, or the last one before it."""
+        return self._tick(symbol, np.searchsorted(self.timestamps, timestamp, side="right") - 1)
+
+    def _tick_before(self, symbol, timestamp):
+        """The last tick strictly before a timestamp, i.e. the latest one when a bar closes."""
+        return self._tick(symbol, np.searchsorted(self.timestamps, timestamp, side="left") - 1)
+
+    def _tick(self, symbol, row):
+        i = self.symbol_index[symbol]
+        price = float(self.prices[row, i])
+        return {
+            "symbol": symbol,
+            "timestamp": float(self.timestamps[row]),
+            "price": price,
+            "reference_option_price": float(self.option_prices[row, i]),
+            "reference_option_strike": price
+        }
+
+
+def run_research_backtest(start_date, end_timestamp):
+    """Runs the backtest from cached bars and indicator series where available."""
+    return ResearchBacktest(start_date, end_timestamp).run()
@@ -0,0 +1,200 @@
+import datetime
+import heapq
+import itertools
+import json
+import math
+import numpy as np
+from config import BAR_INTERVAL_MINUTES, CALENDAR_FILE
+
+# Event types, listed in the order they are handled when they share a timestamp:
+# a bar is closed before the next tick opens a new one, and signal checks and
+# expiries see the tick of the moment they fire
+BAR_CLOSE = "BAR_CLOSE"
+TICK = "TICK"
+SIGNAL_CHECK = "SIGNAL_CHECK"
+OPTION_EXPIRY = "OPTION_EXPIRY"
+
+
+class TradingCalendar:
+    """
+    Trading sessions, weekends and holidays loaded from a local calendar file.
+    Holidays are only known between the file's first_day and last_day, so
+    dates outside that range are rejected rather than treated as sessions.
+    """
+    def __init__(self, calendar_file=CALENDAR_FILE):
+        with open(calendar_file) as f:
+            calendar = json.load(f)
+        self.first_day = datetime.date.fromisoformat(calendar["first_day"])
+        self.last_day = datetime.date.fromisoformat(calendar["last_day"])
+        self.session_open = datetime.time.fromisoformat(calendar["session_open"])
+        self.session_close = datetime.time.fromisoformat(calendar["session_close"])
+        self.weekend_days = set(calendar.get("weekend_days", [5, 6]))
+        self.holidays = {datetime.date.fromisoformat(day) for day in calendar.get("holidays", [])}
+        self.early_closes = {
+            datetime.date.fromisoformat(day): datetime.time.fromisoformat(close)
+            for day, close in calendar.get("early_closes", {}).items()
+        }
+
+    def is_trading_day(self, day):
+        if not self.first_day <= day <= self.last_day:
+            raise ValueError(
+                f"{day} is outside the trading calendar ({self.first_day} to {self.last_day}). "
+                f"Extend {CALENDAR_FILE} with the holidays of that period."
+            )
+        return day.weekday() not in self.weekend_days and day not in self.holidays
+
+    def session_bounds(self, day):
+        """Returns the (open, close) datetimes of the session on a given date, or None if the market is closed."""
+        if not self.is_trading_day(day):
+            return None
+        close = self.early_closes.get(day, self.session_close)
+        return datetime.datetime.combine(day, self.session_open), datetime.datetime.combine(day, close)
+
+    def next_session(self, moment):
+        """Returns the bounds of the session in progress at a given datetime, or of the next one to open."""
+        day = moment.date()
+        for _ in range(366):
+            bounds = self.session_bounds(day)
+            if bounds and bounds[1] > moment:
+                return bounds
+            day += datetime.timedelta(days=1)
+        raise ValueError(f"No trading session found within a year of {moment}. Check {CALENDAR_FILE}.")
+
+
+class SessionClock:
+    """
+    Manages time passed in the backtest simulation, stepping through trading
+    sessions only: once a session closes, the clock jumps to the next open.
+    """
+    def __init__(self, calendar, start_date, tick_interval_seconds):
+        self.calendar = calendar
+        self.tick_interval = datetime.timedelta(seconds=tick_interval_seconds)
+        self.bar_interval_seconds = BAR_INTERVAL_MINUTES * 60
+        self.current_time = datetime.datetime.fromtimestamp(self.align(start_date.timestamp()))
+        self.session_open, self.session_close = calendar.next_session(self.current_time)
+        self._bar_session = (self.session_open.timestamp(), self.session_close.timestamp())
+
+    def get_timestamp(self):
+        """Returns the current simulated time as a Unix timestamp."""
+        return self.current_time.timestamp()
+
+    def advance(self):
+        """Moves the clock forward by one tick interval, skipping non-trading time."""
+        self.current_time += self.tick_interval
+        if self.current_time >= self.session_close:
+            self._next_session()
+
+    def next_timestamps(self, n):
+        """Returns the next n tick timestamps as an array and moves the clock past them."""
+        step = self.tick_interval.total_seconds()
+        timestamps = []
+        remaining = n
+        while remaining > 0:
+            start = self.get_timestamp()
+            ticks_left_in_session = math.ceil((self.session_close.timestamp() - start) / step)
+            count = min(ticks_left_in_session, remaining)
+            timestamps.append(start + step * np.arange(count))
+            remaining -= count
+            self.current_time += self.tick_interval * count
+            if self.current_time >= self.session_close:
+                self._next_session()
+        return np.concatenate(timestamps)
+
+    def ticks_until(self, end_timestamp):
+        """Returns the number of tick times from the current time up to, but excluding, end_timestamp."""
+        step = self.tick_interval.total_seconds()
+        count = 0
+        day = self.current_time.date()
+        # Only days up to the end are looked up, so the calendar need not cover anything past it
+        while day <= datetime.datetime.fromtimestamp(end_timestamp).date():
+            bounds = self.calendar.session_bounds(day)
+            if bounds:
+                start = max(bounds[0], self.current_time).timestamp()
+                stop = min(bounds[1].timestamp(), end_timestamp)
+                if stop > start:
+                    count += math.ceil((stop - start) / step)
+            day += datetime.timedelta(days=1)
+        return count
+
+    def align(self, timestamp):
+        """Returns the first tick time at or after a timestamp, rolling over to the next session if needed."""
+        moment = datetime.datetime.fromtimestamp(timestamp)
+        session_open, session_close = self.calendar.next_session(moment)
+        if moment <= session_open:
+            return session_open.timestamp()
+        step = self.tick_interval.total_seconds()
+        open_ts = session_open.timestamp()
+        aligned = open_ts + math.ceil((timestamp - open_ts) / step) * step
+        if aligned >= session_close.timestamp():
+            return self.calendar.next_session(session_close)[0].timestamp()
+        return aligned
+
+    def bar_start(self, timestamp):
+        """Returns the start of the bar containing a timestamp, with bars anchored to the session open."""
+        open_ts, close_ts = self._session_for(timestamp)
+        if open_ts is None:
+            return int(timestamp / self.bar_interval_seconds) * self.bar_interval_seconds
+        return open_ts + int((timestamp - open_ts) / self.bar_interval_seconds) * self.bar_interval_seconds
+
+    def bar_close(self, timestamp):
+        """Returns the end of the bar containing a timestamp; the last bar of a session ends at the close."""
+        open_ts, close_ts = self._session_for(timestamp)
+        if open_ts is None:
+            return self.bar_start(timestamp) + self.bar_interval_seconds
+        return min(self.bar_start(timestamp) + self.bar_interval_seconds, close_ts)
+
+    def _next_session(self):
+        self.session_open, self.session_close = self.calendar.next_session(self.session_close)
+        self.current_time = self.session_open
+
+    def _session_for(self, timestamp):
+        # The same session is looked up for every tick, so keep the last one
+        open_ts, close_ts = self._bar_session
+        if not open_ts <= timestamp < close_ts:
+            bounds = self.calendar.session_bounds(datetime.datetime.fromtimestamp(timestamp).date())
+            if bounds is None or not bounds[0].timestamp() <= timestamp < bounds[1].timestamp():
+                return None, None
+            open_ts, close_ts = bounds[0].timestamp(), bounds[1].timestamp()
+            self._bar_session = (open_ts, close_ts)
+        return open_ts, close_ts
+
+
+class EventScheduler:
+    """
+    Discrete-event scheduler: a heap of timed events, so the backtest jumps
+    straight from one event to the next instead of stepping through idle time.
+    align is an optional callable moving a timestamp to the next tick time
+    (SessionClock.align), used by schedule_at_tick.
+    """
+    PRIORITY = {BAR_CLOSE: 0, TICK: 1, SIGNAL_CHECK: 2, OPTION_EXPIRY: 3}
+
+    def __init__(self, end_timestamp=math.inf, align=None):
+        self.end_timestamp = end_timestamp
+        self.align = align
+        self.events = []
+        self.counter = itertools.count() # Keeps events with equal time and priority in FIFO order
+
+    def __len__(self):
+        return len(self.events)
+
+    def schedule(self, timestamp, event_type, payload=None):
+        heapq.heappush(self.events, (timestamp, self.PRIORITY[event_type], next(self.counter), event_type, payload))
+
+    def schedule_at_tick(self, timestamp, event_type, payload=None):
+        """
+        Schedules an event at the first tick time at or after a timestamp. Events
+        due at or after the end of the backtest could never fire, so they are
+        dropped before aligning, which may need sessions past the calendar.
+        """
+        if timestamp >= self.end_timestamp:
+            return
+        self.schedule(self.align(timestamp), event_type, payload)
+
+    def next_time(self):
+        """Returns the time of the next event, or None if nothing is scheduled."""
+        return self.events[0][0] if self.events else None
+
+    def pop(self):
+        """Removes and returns the next event as (timestamp, event_type, payload)."""
+        timestamp, _, _, event_type, payload = heapq.heappop(self.events)
+        return timestamp, event_type, payload
@@ -8,6 +8,7 @@ class Logger:
     def __init__(self, log_file_path="trade_log.csv"):
         self.log_file_path = log_file_path
         self.open_trades = {}  # symbol -> trade_details
+        self.closed_trades = []  # completed trade records, as written to the CSV
         self.trade_id_counter = 0
         self._initialize_log()
 
@@ -75,5 +76,6 @@ class Logger:
         with open(self.log_file_path, 'a', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(trade.values())
+        self.closed_trades.append(trade)
 
         print(f"Logged CLOSE for Trade ID {trade['Trade_ID']} on {symbol}. Net P/L: {trade['Net_PL']:.2f}")
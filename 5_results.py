@@ -0,0 +1,156 @@
+import datetime
+import json
+import os
+import subprocess
+import uuid
+import numpy as np
+import pandas as pd
+import config
+from config import RESULTS_DIR, MARKET_DATA_SEED
+
+SECRET_SETTINGS = ("API_KEY", "API_SECRET", "DB_CONN") # Never written to the results store
+INDEX_FILE = "index.jsonl"
+
+def run_parameters():
+    """Returns the config settings of the current run, without credentials."""
+    return {
+        name: getattr(config, name) for name in dir(config)
+        if name.isupper() and name not in SECRET_SETTINGS
+    }
+
+def _hashable(value):
+    """Turns JSON lists (e.g. SYMBOLS) into tuples, so runs can be filtered and grouped by them."""
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+def code_version():
+    """Returns the git commit the code is running from, or 'unknown' outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+class ResultsStore:
+    """
+    Local store of backtest results that every run appends to.
+
+    Each run's trades and equity points are written column by column as .npy
+    files, partitioned by run date: <root>/<table>/run_date=YYYY-MM-DD/<run_id>/<column>.npy.
+    One line per run is then appended to <root>/index.jsonl with the run id,
+    parameters, seed, code version and summary metrics, so comparing runs
+    only reads the index, never the trades themselves.
+    """
+    def __init__(self, root=RESULTS_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        os.makedirs(root, exist_ok=True)
+
+    def append_run(self, trades, equity_history, metrics, params=None, seed=MARKET_DATA_SEED, run_id=None):
+        """
+        Stores one run and returns its run id.
+        trades: list of closed trade records (Logger.closed_trades)
+        equity_history: list of (timestamp, marked-to-market equity) points (Portfolio.equity_history)
+        """
+        created = datetime.datetime.now()
+        run_id = run_id or f"{created:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        partition = f"run_date={created:%Y-%m-%d}"
+
+        trade_columns = {name: [trade.get(name) for trade in trades] for name in (trades[0] if trades else {})}
+        self._write_columns("trades", partition, run_id, trade_columns)
+        self._write_columns("equity", partition, run_id, {
+            "timestamp": [timestamp for timestamp, _ in equity_history],
+            "equity": [cash for _, cash in equity_history]
+        })
+
+        # The index line goes last, so it only ever points at complete runs
+        entry = {
+            "run_id": run_id,
+            "created": created.isoformat(timespec="seconds"),
+            "partition": partition,
+            "seed": seed,
+            "code_version": code_version(),
+            "params": params if params is not None else run_parameters(),
+            "metrics": metrics or {}
+        }
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        print(f"Results stored as run {run_id} in {self.root}")
+        return run_id
+
+    def runs(self, **filters):
+        """
+        Returns the run index as a DataFrame, one row per run, with parameters
+        and metrics flattened into 'params.<NAME>' and 'metrics.<name>' columns.
+        List settings become tuples. Keyword filters keep runs whose column
+        equals the value, e.g. runs(MARKET_DATA_MODEL='GBM', SYMBOLS=['SPY']).
+        """
+        if not os.path.exists(self.index_path):
+            return pd.DataFrame()
+        with open(self.index_path) as f:
+            index = pd.json_normalize([json.loads(line) for line in f if line.strip()])
+        for column in index.columns[index.dtypes == object]:
+            index[column] = index[column].map(_hashable)
+        for name, value in filters.items():
+            value = _hashable(value)
+            index = index[index[self._column(index, name)].map(lambda cell: cell == value).astype(bool)]
+        return index
+
+    def aggregate(self, metrics, by=None, agg="mean", **filters):
+        """
+        Aggregates metrics across the runs that match the filters, optionally
+        grouped by one or more parameters, e.g.
+        aggregate(["sharpe_ratio", "total_return_pct"], by="SLIPPAGE_PERCENT", agg=["mean", "std"]).
+        """
+        index = self.runs(**filters)
+        if index.empty:
+            return pd.DataFrame()
+        metric_columns = [self._column(index, name) for name in ([metrics] if isinstance(metrics, str) else metrics)]
+        if by is None:
+            return index[metric_columns].agg(agg)
+        group_columns = [self._column(index, name) for name in ([by] if isinstance(by, str) else by)]
+        return index.groupby(group_columns)[metric_columns].agg(agg)
+
+    def load_trades(self, run_id, columns=None):
+        """Loads the trades of one run, optionally only some columns."""
+        return self._read_columns("trades", run_id, columns)
+
+    def load_equity(self, run_id):
+        """Loads the equity points of one run."""
+        return self._read_columns("equity", run_id)
+
+    def _column(self, index, name):
+        # Accept bare parameter and metric names as well as full column names
+        for column in (name, f"params.{name}", f"metrics.{name}"):
+            if column in index.columns:
+                return column
+        raise KeyError(f"No run metadata column named '{name}'.")
+
+    def _run_dir(self, table, partition, run_id):
+        return os.path.join(self.root, table, partition, run_id)
+
+    def _write_columns(self, table, partition, run_id, columns):
+        run_dir = self._run_dir(table, partition, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        for name, values in columns.items():
+            array = np.asarray(values)
+            if array.dtype.kind not in "biuf": # Integer columns such as Trade_ID keep their dtype
+                try:
+                    array = np.asarray(values, dtype=np.float64)
+                except (TypeError, ValueError):
+                    array = np.asarray([str(value) for value in values]) # Text columns, stored without pickling
+            np.save(os.path.join(run_dir, f"{name}.npy"), array)
+
+    def _read_columns(self, table, run_id, columns=None):
+        runs = self.runs(run_id=run_id)
+        if runs.empty:
+            raise KeyError(f"No run with id '{run_id}' in {self.root}.")
+        run_dir = self._run_dir(table, runs.iloc[0]["partition"], run_id)
+        names = columns or sorted(name[:-4] for name in os.listdir(run_dir) if name.endswith(".npy"))
+        # Memory-mapped, so only the columns actually used are read from disk
+        return pd.DataFrame({name: np.load(os.path.join(run_dir, f"{name}.npy"), mmap_mode="r") for name in names})